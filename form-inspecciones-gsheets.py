@@ -1,102 +1,211 @@
 """ CREACIÓN DE FORMULARIO WEB CON STREAMLIT """
 
 import streamlit as st
-from streamlit_gsheets import GSheetsConnection
+import gspread
 import pandas as pd
-import numpy as np
 import time
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
-def get_worksheet_data(_conn, worksheet_name):
-    """Simple cached function to get worksheet data"""
-    return _conn.read(worksheet=worksheet_name)
+WORKSHEETS = ("inspecciones", "vehiculos", "rutas", "partes")
+CACHE_TTL = 300  # Cache for 5 minutes
+
+def header_names(encabezado):
+    """Column names like pandas' readers: "Unnamed: i" for empty cells, "name.1" for repeats"""
+    columnas = []
+    vistos = {}
+    for i, nombre in enumerate(encabezado):
+        nombre = str(nombre) if nombre != "" else f"Unnamed: {i}"
+        base = nombre
+        while nombre in vistos:
+            vistos[base] += 1
+            nombre = f"{base}.{vistos[base]}"
+        vistos.setdefault(base, 0)
+        vistos[nombre] = 0
+        columnas.append(nombre)
+    return columnas
+
+def values_to_dataframe(values):
+    """Build a DataFrame from a Google Sheets value range (header in the first row)"""
+    if not values:
+        return pd.DataFrame()
+    columnas = header_names(values[0])
+    # The API trims trailing empty cells, so rows are cut or padded to the header width
+    n = len(columnas)
+    filas = [fila[:n] + [None] * (n - len(fila)) for fila in values[1:]]
+    df = pd.DataFrame(filas, columns=columnas)
+    # Blank rows in the middle of the sheet are skipped, as the previous reader did
+    df = df.mask(df.eq("")).dropna(how="all").reset_index(drop=True)
+    return df.infer_objects()
+
+def categorize_low_cardinality(df, max_ratio=0.5):
+    """Store repetitive text columns (empresa, parte, placa...) as categoricals"""
+    # Only pure-text columns: mixed int/str categories (e.g. numero_economico) can't go to Arrow
+    objetos = df.select_dtypes(include="object")
+    texto = [col for col in objetos.columns
+             if pd.api.types.infer_dtype(objetos[col], skipna=True) == "string"]
+    proporcion = objetos[texto].nunique() / max(len(df), 1)
+    return df.astype({col: "category" for col in proporcion.index[proporcion < max_ratio]})
+
+def prepare_inspecciones(df):
+    """Categorical filter columns, Arrow-backed dtypes and newest-first order for tab 2"""
+    if df.columns.empty:
+        return df
+    df = df.astype({"empresa": "category", "estado_parte": "category"})
+    # format="mixed": each value is parsed on its own instead of guessing one format for all,
+    # so only genuinely invalid dates become NaT
+    df["fecha_inspeccion"] = pd.to_datetime(df["fecha_inspeccion"], format="mixed",
+                                            errors="coerce")
+    # Sort once on datetime64 (stable, so same-day rows keep sheet order); tab 2 never re-sorts
+    df.sort_values("fecha_inspeccion", ascending=False, kind="stable", inplace=True,
+                   ignore_index=True)
+    # Arrow-backed columns (single type + null bitmap) are sent to st.dataframe without cleaning
+    return df.convert_dtypes(dtype_backend="pyarrow")
+
+@st.cache_resource
+def get_gspread_client():
+    """Single authorized gspread client (one HTTP session and OAuth token for every rerun)"""
+    credenciales = {clave: valor for clave, valor in st.secrets["connections"]["gsheets"].items()
+                    if clave not in ("spreadsheet", "worksheet")}
+    return gspread.service_account_from_dict(credenciales)
+
+@st.cache_resource
+def get_spreadsheet():
+    """Spreadsheet configured in Streamlit Secrets, opened once with the shared gspread client"""
+    spreadsheet = st.secrets["connections"]["gsheets"]["spreadsheet"]
+    if spreadsheet.startswith("http"):
+        return get_gspread_client().open_by_url(spreadsheet)
+    return get_gspread_client().open(spreadsheet)
+
+def read_worksheets(spreadsheet, worksheet_names):
+    """Read several worksheets with a single batchGet request (no cache)"""
+    respuesta = spreadsheet.values_batch_get(
+        ranges=list(worksheet_names),
+        params={"valueRenderOption": "UNFORMATTED_VALUE",
+                "dateTimeRenderOption": "FORMATTED_STRING"})
+    hojas = {nombre: categorize_low_cardinality(values_to_dataframe(rango.get("values", [])))
+             for nombre, rango in zip(worksheet_names, respuesta["valueRanges"])}
+    if "inspecciones" in hojas:
+        hojas["inspecciones"] = prepare_inspecciones(hojas["inspecciones"])
+    return hojas
+
+# persist="disk" does not support ttl: the function has a fixed key, so there is a single
+# entry (one file on disk), and load_worksheets clears it once it is older than CACHE_TTL
+@st.cache_data(persist="disk", show_spinner="Leyendo hojas de cálculo...")
+def get_worksheets_data(_spreadsheet):
+    """Cached worksheets (single batchGet request), persisted on disk across restarts"""
+    hojas = read_worksheets(_spreadsheet, WORKSHEETS)
+    leido = time.time()
+    for df in hojas.values():
+        df.attrs["leido"] = leido
+    return hojas
+
+def load_worksheets(spreadsheet):
+    """Worksheets from the persisted cache, read again once they are older than CACHE_TTL"""
+    hojas = get_worksheets_data(spreadsheet)
+    if time.time() - hojas["inspecciones"].attrs["leido"] > CACHE_TTL:
+        get_worksheets_data.clear()
+        hojas = get_worksheets_data(spreadsheet)
+    return hojas
+
+def dataframe_signature(df):
+    """Cheap cache key for DataFrames stamped by get_worksheets_data (full hash otherwise)"""
+    leido = df.attrs.get("leido")
+    if leido is None:
+        return pd.util.hash_pandas_object(df).values.tobytes()
+    return leido, len(df), tuple(df.columns)
+
+HASH_FUNCS = {pd.DataFrame: dataframe_signature}
+
+@st.cache_data(ttl=CACHE_TTL, hash_funcs=HASH_FUNCS)
+def get_danios_por_empresa(inspecciones):
+    """Cached damaged-part rows indexed by empresa (keeps the newest-first order)"""
+    danios = inspecciones[inspecciones["estado_parte"] == "MAL ESTADO"]
+    return danios.set_index("empresa", drop=False)
+
+@st.cache_data(ttl=CACHE_TTL, hash_funcs=HASH_FUNCS)
+def get_historial_danios(danios, empresa):
+    """Cached damaged-part history of a single empresa, ready for display"""
+    if empresa not in danios.index:
+        return danios.iloc[:0].reset_index(drop=True)
+    # Arrow-backed columns pass through; leftover mixed-type object columns (numero_economico)
+    # are stringified here once per empresa instead of on every rerun
+    return clean_dataframe_for_display(danios.loc[[empresa]].reset_index(drop=True))
+
+@st.cache_data(ttl=CACHE_TTL, hash_funcs=HASH_FUNCS)
+def get_lookup_tables(rutas, vehiculos):
+    """Cached dictionaries to keep the route and vehicle selectboxes in sync (first match wins)"""
+    rutas_unicas = rutas.drop_duplicates("ruta")
+    numeros_unicos = rutas.drop_duplicates("numero_ruta")
+    return {
+        "numero_por_ruta": dict(zip(rutas_unicas["ruta"], rutas_unicas["numero_ruta"])),
+        "ruta_por_numero": dict(zip(numeros_unicos["numero_ruta"], numeros_unicos["ruta"])),
+        "vehiculo_por_numero": vehiculos.drop_duplicates("numero_economico")
+                                        .set_index("numero_economico")[["placa", "empresa"]]
+                                        .to_dict("index"),
+        "vehiculo_por_placa": vehiculos.drop_duplicates("placa")
+                                       .set_index("placa")[["numero_economico", "empresa"]]
+                                       .to_dict("index"),
+        "vehiculo_por_empresa": vehiculos.drop_duplicates("empresa")
+                                         .set_index("empresa")[["numero_economico", "placa"]]
+                                         .to_dict("index")
+    }
+
+@st.cache_data(ttl=CACHE_TTL, hash_funcs=HASH_FUNCS)
+def get_ubicaciones_por_parte(partes):
+    """Cached valid locations of each part and the shortest one, used as default location"""
+    ubicaciones = (partes.groupby("parte", sort=False, observed=True)["ubicacion_parte"]
+                   .apply(lambda serie: serie.dropna().unique().tolist())
+                   .to_dict())
+    ubicacion_mas_corta = {parte: min(map(str, valores), key=len)
+                           for parte, valores in ubicaciones.items() if valores}
+    return ubicaciones, ubicacion_mas_corta
 
 def clean_dataframe_for_display(df):
     """Safely clean dataframe for display by handling data type issues"""
-    df_clean = df.copy()
+    # Shallow copy: only the replaced object columns are new, the rest is shared with df
+    df_clean = df.copy(deep=False)
     
-    # Convert problematic columns to string to avoid display issues
-    if 'numero_economico' in df_clean.columns:
-        df_clean['numero_economico'] = df_clean['numero_economico'].astype(str)
-    
-    # Handle any other potential type issues
-    for col in df_clean.columns:
-        if df_clean[col].dtype == 'object':
-            # Convert mixed types to string
-            df_clean[col] = df_clean[col].astype(str)
-            # Replace "nan" strings and empty strings with None for cleaner display
-            df_clean[col] = df_clean[col].replace(['nan', ''], None)
+    # Convert mixed-type columns to string in one pass and replace "nan"/empty strings with None
+    obj_cols = df_clean.select_dtypes(include="object").columns
+    if len(obj_cols) > 0:
+        df_clean[obj_cols] = df_clean[obj_cols].astype(str).replace({"nan": None, "": None})
     
     return df_clean
 
 
+@st.cache_data(ttl=CACHE_TTL, hash_funcs=HASH_FUNCS)
+def get_vehiculos_view(vehiculos):
+    """Cached display version of the vehicles sheet for tab 3"""
+    return clean_dataframe_for_display(vehiculos)
+
+def dataframe_to_rows(df, columns):
+    """Convert a DataFrame into JSON-safe rows aligned with the worksheet header"""
+    alineado = df.reindex(columns=columns).astype(object)
+    alineado = alineado.where(alineado.notna(), "")
+    # Fechas y horas como texto ISO (YYYY-MM-DD, HH:MM:SS)
+    return [[valor.isoformat() if hasattr(valor, "isoformat") else valor for valor in fila]
+            for fila in alineado.values.tolist()]
+
+def append_worksheet_rows(spreadsheet, worksheet_name, new_data, columns):
+    """Append only the new rows to a worksheet instead of rewriting the whole sheet"""
+    if len(columns) == 0:
+        columns = new_data.columns
+    worksheet = spreadsheet.worksheet(worksheet_name)
+    # USER_ENTERED so ISO dates/times become real date and time cells, like the existing rows
+    worksheet.append_rows(dataframe_to_rows(new_data, columns),
+                          value_input_option="USER_ENTERED", insert_data_option="INSERT_ROWS")
 
-def safe_gsheets_update(conn, worksheet_name, new_data, existing_data=None):
-    """
-    Safely update Google Sheets worksheet with data validation and backup
-    
-    Args:
-        conn: GSheetsConnection object
-        worksheet_name: Name of the worksheet to update
-        new_data: New data to append
-        existing_data: Existing data (if None, will be read from worksheet)
-    
-    Returns:
-        bool: True if successful, False otherwise
-    """
-    try:
-        # Read existing data if not provided
-        if existing_data is None:
-            existing_data = conn.read(worksheet=worksheet_name, ttl=0)
-        
-        # Validate existing data
-        if existing_data is None or existing_data.empty:
-            st.error(f"❌ No se pudieron leer los datos existentes de {worksheet_name}")
-            return False
-        
-        if not isinstance(existing_data, pd.DataFrame):
-            st.error(f"❌ Los datos existentes de {worksheet_name} no tienen el formato esperado")
-            return False
-        
-        # Create backup
-        backup_data = existing_data.copy()
-        
-        # Ensure data type consistency
-        for col in new_data.columns:
-            if col in existing_data.columns:
-                if existing_data[col].dtype != new_data[col].dtype:
-                    try:
-                        new_data[col] = new_data[col].astype(existing_data[col].dtype)
-                    except:
-                        existing_data[col] = existing_data[col].astype(str)
-                        new_data[col] = new_data[col].astype(str)
-        
-        # Concatenate data
-        updated_data = pd.concat([existing_data, new_data], ignore_index=True)
-        
-        # Final validation
-        if len(updated_data) < len(existing_data):
-            st.error(f"❌ La operación resultaría en pérdida de datos en {worksheet_name}")
-            return False
-        
-        # Update worksheet
-        conn.update(worksheet=worksheet_name, data=updated_data)
-        return True
-        
-    except Exception as e:
-        st.error(f"❌ Error en safe_gsheets_update: {str(e)}")
-        return False
 
 # Conexión a la Base de datos en Google Sheets
 try:
-    conn = st.connection("gsheets", type=GSheetsConnection)
+    spreadsheet = get_spreadsheet()
     
-    # Consulta de la información en la Base de datos con cache simple
-    inspecciones = get_worksheet_data(conn, "inspecciones")
-    vehiculos = get_worksheet_data(conn, "vehiculos")
-    rutas = get_worksheet_data(conn, "rutas")
+    # Consulta de la información en la Base de datos con cache simple (una sola petición)
+    hojas = load_worksheets(spreadsheet)
+    inspecciones = hojas["inspecciones"]
+    vehiculos = hojas["vehiculos"]
+    rutas = hojas["rutas"]
     rutas["numero_ruta"] = rutas["numero_ruta"].astype(int)
-    partes = get_worksheet_data(conn, "partes")
+    partes = hojas["partes"]
     partes_unicas = partes["parte"].unique()
     
     # Título de la página web
@@ -147,28 +256,26 @@ with tab_1:
     if "empresa" not in st.session_state:
         st.session_state.empresa = vehiculos["empresa"].iloc[0]
 
+    tablas = get_lookup_tables(rutas, vehiculos)
+
     def on_ruta_change():
-        nuevo_numero = rutas[rutas["ruta"] == st.session_state.nombre_ruta][
-            "numero_ruta"].values[0]
-        st.session_state.numero_ruta = nuevo_numero
+        st.session_state.numero_ruta = tablas["numero_por_ruta"][st.session_state.nombre_ruta]
 
     def on_numero_ruta_change():
-        nuevo_nombre = rutas[rutas["numero_ruta"] == st.session_state.numero_ruta][
-            "ruta"].values[0]
-        st.session_state.nombre_ruta = nuevo_nombre
+        st.session_state.nombre_ruta = tablas["ruta_por_numero"][st.session_state.numero_ruta]
 
     def on_numero_economico_change():
-        fila = vehiculos[vehiculos["numero_economico"] == st.session_state.numero_economico].iloc[0]
+        fila = tablas["vehiculo_por_numero"][st.session_state.numero_economico]
         st.session_state.placa = fila["placa"]
         st.session_state.empresa = fila["empresa"]
 
     def on_placa_change():
-        fila = vehiculos[vehiculos["placa"] == st.session_state.placa].iloc[0]
+        fila = tablas["vehiculo_por_placa"][st.session_state.placa]
         st.session_state.numero_economico = fila["numero_economico"]
         st.session_state.empresa = fila["empresa"]
 
     def on_empresa_change():
-        fila = vehiculos[vehiculos["empresa"] == st.session_state.empresa].iloc[0]
+        fila = tablas["vehiculo_por_empresa"][st.session_state.empresa]
         st.session_state.numero_economico = fila["numero_economico"]
         st.session_state.placa = fila["placa"]
 
@@ -184,7 +291,7 @@ with tab_1:
                                        key="numero_economico",
                                        on_change=on_numero_economico_change)
     placa = col_2.selectbox("Placa", vehiculos["placa"], key="placa", on_change=on_placa_change)
-    empresa = col_3.selectbox("Empresa", vehiculos["empresa"].unique(), key="empresa",
+    empresa = col_3.selectbox("Empresa", list(tablas["vehiculo_por_empresa"]), key="empresa",
                               on_change=on_empresa_change)
     st.divider()
 
@@ -193,95 +300,76 @@ with tab_1:
     partes_danadas = st.multiselect('Selecciona las partes dañadas', partes_unicas,
                                     key="partes_danadas")
 
-    eventos_parte = {}
+    ubicaciones_por_parte, ubicacion_mas_corta = get_ubicaciones_por_parte(partes)
+    ubicaciones_seleccionadas = {}
 
     for parte in partes_danadas:
-        st.divider()
-        col_1, col_2 = st.columns([1, 3])
-        ubicaciones_parte = partes.loc[partes["parte"] == parte, "ubicacion_parte"].unique()
         key_ubicaciones = f"ubicaciones_{parte}"
-        ubicaciones_seleccionadas = col_1.multiselect(f"Ubicación de {parte}", ubicaciones_parte,
-                                                      key=key_ubicaciones)
-
-        for ubicacion in ubicaciones_seleccionadas:
-            key_observacion = f"observacion_{parte}_{ubicacion}"
-            observacion = col_2.text_area(f"Observación para {parte} en {ubicacion}",
-                                          key=key_observacion)
-            eventos_parte[(parte, ubicacion)] = observacion
-
-    inspeccion = []
-
-    for parte in partes_unicas:
-
-        if parte in partes_danadas:
-            for (parte_danada, ubicacion), observacion in eventos_parte.items():
-                ubicaciones_parte = ubicacion
-                estado = "MAL ESTADO"
-                if parte_danada == parte:
-                    parte_inspeccionada = {
-                        "folio_inspeccion": folio_inspeccion,
-                        "modalidad_inspeccion": modalidad_inspeccion,
-                        "fecha_inspeccion": fecha_inspeccion,
-                        "hora_inspeccion": hora_inspeccion,
-                        "inspector": inspector,
-                        "numero_ruta": numero_ruta,
-                        "ruta": ruta,
-                        "numero_economico": numero_economico,
-                        "placa": placa,
-                        "empresa": empresa,
-                        "parte": parte,
-                        "ubicacion_parte": ubicacion,
-                        "estado_parte": estado,
-                        "descripcion_evento": observacion,
-                        "fuente_evento" : "INSPECCIÓN"
-                    }
-                    inspeccion.append(parte_inspeccionada)
+        ubicaciones_seleccionadas[parte] = st.multiselect(f"Ubicación de {parte}",
+                                                          ubicaciones_por_parte.get(parte, []),
+                                                          key=key_ubicaciones)
 
-        else:
-            estado = "BUEN ESTADO"
-            ubicaciones_parte = partes.loc[partes["parte"] == parte, "ubicacion_parte"].unique()
-            ubicaciones_validas = [str(ubicacion) for ubicacion in ubicaciones_parte if
-                                   pd.notnull(ubicacion)]
-            if ubicaciones_validas:
-                ubicacion_parte = min(ubicaciones_validas, key=len)
-            else:
-                ubicacion_parte = np.nan
-
-            parte_inspeccionada = {
-                "folio_inspeccion" : folio_inspeccion,
-                "modalidad_inspeccion" : modalidad_inspeccion,
-                "fecha_inspeccion" : fecha_inspeccion,
-                "hora_inspeccion" : hora_inspeccion,
-                "inspector" : inspector,
-                "numero_ruta" : numero_ruta,
-                "ruta" : ruta,
-                "numero_economico" : numero_economico,
-                "placa" : placa,
-                "empresa" : empresa,
-                "parte" : parte,
-                "ubicacion_parte" : ubicacion_parte,
-                "estado_parte" : estado,
-                "descripcion_evento" : "",
-                "fuente_evento": "INSPECCIÓN"
-            }
-            inspeccion.append(parte_inspeccionada)
+    # Observaciones y registro dentro de un formulario: escribir en los campos de texto no
+    # provoca un rerun completo de la página, solo el envío del formulario
+    st.divider()
+    with st.form("inspection_form", clear_on_submit=False):
+        eventos_parte = {}
+
+        for parte, ubicaciones_parte in ubicaciones_seleccionadas.items():
+            for ubicacion in ubicaciones_parte:
+                key_observacion = f"observacion_{parte}_{ubicacion}"
+                observacion = st.text_area(f"Observación para {parte} en {ubicacion}",
+                                           key=key_observacion)
+                eventos_parte[(parte, ubicacion)] = observacion
+
+        # Guardar datos de la inspección
+        registrar = st.form_submit_button("Registrar datos de la inspección en Google Drive")
 
-    df_inspeccion = pd.DataFrame(inspeccion)
+    # Partes en mal estado: una fila por (parte, ubicación) con su observación
+    df_mal_estado = pd.DataFrame(list(eventos_parte.keys()), columns=["parte", "ubicacion_parte"])
+    df_mal_estado = df_mal_estado.assign(estado_parte="MAL ESTADO",
+                                         descripcion_evento=list(eventos_parte.values()))
 
     # Vista previa de la inspección
     # st.divider()
     # st.dataframe(inspeccion)
 
-    # Guardar datos de la inspección
-    st.divider()
-    if st.button("Registrar datos de la inspección en Google Drive"):
+    if registrar:
         if not folio_inspeccion or not st.session_state.numero_economico:
             st.error("Por favor indica el número de folio y el número económico del vehículo.")
         else:
-            inspecciones_sin_cache = conn.read(worksheet="inspecciones", ttl=0)
-            inspecciones_actualizadas = pd.concat([inspecciones_sin_cache, df_inspeccion],
-                                                  ignore_index=True)
-            conn.update(worksheet="inspecciones", data=inspecciones_actualizadas)
+            # Partes en buen estado (solo al registrar, no en cada rerun): la ubicación por
+            # defecto es la más corta de cada parte
+            ubicacion_por_defecto = pd.Series(ubicacion_mas_corta, dtype=object)
+            # Pertenencia por tabla hash (Index.isin), sin comparar cada parte contra cada dañada
+            partes_buenas = partes_unicas[~pd.Index(partes_unicas).isin(partes_danadas)]
+            df_buen_estado = pd.DataFrame({
+                "parte": partes_buenas,
+                "ubicacion_parte": ubicacion_por_defecto.reindex(partes_buenas).values,
+                "estado_parte": "BUEN ESTADO",
+                "descripcion_evento": ""
+            })
+
+            datos_inspeccion = {
+                "folio_inspeccion": folio_inspeccion,
+                "modalidad_inspeccion": modalidad_inspeccion,
+                "fecha_inspeccion": fecha_inspeccion,
+                "hora_inspeccion": hora_inspeccion,
+                "inspector": inspector,
+                "numero_ruta": numero_ruta,
+                "ruta": ruta,
+                "numero_economico": numero_economico,
+                "placa": placa,
+                "empresa": empresa
+            }
+            columnas_inspeccion = [*datos_inspeccion, "parte", "ubicacion_parte", "estado_parte",
+                                   "descripcion_evento", "fuente_evento"]
+            df_inspeccion = (pd.concat([df_mal_estado, df_buen_estado], ignore_index=True)
+                             .assign(**datos_inspeccion, fuente_evento="INSPECCIÓN")
+                             [columnas_inspeccion])
+
+            append_worksheet_rows(spreadsheet, "inspecciones", df_inspeccion, inspecciones.columns)
+            get_worksheets_data.clear()
             st.success("Inspección guardada exitosamente. ✅")
             # for key in ["folio_inspeccion", "modalidad_inspeccion", "fecha_inspeccion",
             #             "hora_inspeccion", "inspector", "numero_ruta", "nombre_ruta",
@@ -302,14 +390,11 @@ with tab_2:
     st.subheader("Consulta de historial de partes dañadas")
 
     # Selección de vehículo
-    empresas_disponibles = inspecciones["empresa"].unique()
+    empresas_disponibles = inspecciones["empresa"].cat.categories.tolist()
     empresa = st.selectbox("Selecciona la empresa", empresas_disponibles)
 
-    # Filtrar datos
-    historial_danios = inspecciones[
-        (inspecciones["empresa"] == empresa) &
-        (inspecciones["estado_parte"] == "MAL ESTADO")
-    ].sort_values(by="fecha_inspeccion", ascending=False, ignore_index=True)
+    # Filtrar datos (ya ordenados por fecha de inspección descendente al cargar)
+    historial_danios = get_historial_danios(get_danios_por_empresa(inspecciones), empresa)
 
     st.write(f"Historial de partes dañadas para la persona concesionaria {empresa}:")
     
@@ -322,12 +407,10 @@ with tab_2:
         available_columns = [col for col in display_columns if col in historial_danios.columns]
         display_df = historial_danios[available_columns]
         
-        # Clean DataFrame for safe display (this already fixes mixed types)
-        clean_display_df = clean_dataframe_for_display(display_df)
-        
-        st.dataframe(clean_display_df, hide_index=True,
+        st.dataframe(display_df, hide_index=True,
                      column_config={
-                        "fecha_inspeccion" : "Fecha de inspección",
+                        "fecha_inspeccion" : st.column_config.DateColumn("Fecha de inspección",
+                                                                         format="YYYY-MM-DD"),
                         "numero_economico" : "Unidad",
                         "parte" : "Parte",
                         "ubicacion_parte" : "Ubicación",
@@ -345,9 +428,8 @@ with tab_2:
 with tab_3:
 
     st.subheader("Base de datos de vehículos Va-y-Ven")
-    # Clean DataFrame for safe display
-    vehiculos_clean = clean_dataframe_for_display(vehiculos)
-    st.dataframe(vehiculos_clean)
+    # Clean DataFrame for safe display (cached, so reruns reuse the cleaned table)
+    st.dataframe(get_vehiculos_view(vehiculos), height=400)
 
 # Pestaña 4: Estado de los Datos
 
@@ -388,14 +470,11 @@ with tab_4:
             
             # Check for data type issues
             if inspecciones_actuales is not None and not inspecciones_actuales.empty:
-                for col in inspecciones_actuales.columns:
-                    if inspecciones_actuales[col].dtype == 'object':
-                        # Check for mixed types
-                        sample_values = inspecciones_actuales[col].dropna().head(10)
-                        if len(sample_values) > 0:
-                            types = [type(val).__name__ for val in sample_values]
-                            if len(set(types)) > 1:
-                                issues_found.append(f"⚠️ Columna '{col}' tiene tipos mixtos: {set(types)}")
+                for col in inspecciones_actuales.select_dtypes(include="object").columns:
+                    # Check for mixed types (single C-level pass over the column)
+                    kind = pd.api.types.infer_dtype(inspecciones_actuales[col], skipna=True)
+                    if kind.startswith("mixed"):
+                        issues_found.append(f"⚠️ Columna '{col}' tiene tipos mixtos: {kind}")
             
             if issues_found:
                 st.error("Problemas encontrados:")